@@ -1,13 +1,21 @@
 import os
 import re
+import asyncio
+import json
+import itertools
 import difflib
+from collections import namedtuple
+from contextlib import asynccontextmanager
+from functools import lru_cache
 import numpy as np
 import pandas as pd
-import requests
+import pyarrow.parquet as pq
+import httpx
 
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import Response
+from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pathlib import Path
+from typing import Any
 from sklearn.feature_extraction.text import TfidfVectorizer
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -19,7 +27,29 @@ try:
 except Exception:
     genai = None
 
-app = FastAPI(title="Planning GitHub Backend")
+# Optional Numba (retrieval falls back to scipy sparse matmul)
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+# Shared upstream clients, one per app run, created on the serving event loop so calls reuse pooled connections
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    api_key = os.getenv("GEMINI_API_KEY", "")
+    app.state.genai = genai.Client(api_key=api_key).aio if genai and api_key else None
+    app.state.http = httpx.AsyncClient(limits=httpx.Limits(max_connections=32, max_keepalive_connections=16))
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        if app.state.genai is not None:
+            await app.state.genai.aclose()
+
+app = FastAPI(
+    title="Planning GitHub Backend",
+    lifespan=lifespan,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -37,37 +67,89 @@ DATA_DIR = Path("data")
 BUNDLES_PATH = DATA_DIR / "site_bundles.parquet"
 REPO_PATH = DATA_DIR / "site_index_repo.parquet"
 
+# Only these columns are read from the parquet files
+BUNDLE_COLS = ["site_bundle_id","n_apps","council_name","sample_address","first_app","last_app"]
+REPO_COLS = ["site_bundle_id","planning_reference","event_dt","proposal","heading","url",
+             "normalised_application_type","normalised_decision","raw_address"]
+# Low-cardinality REPO columns stored as pandas categoricals
+CATEGORY_COLS = ["site_bundle_id","normalised_application_type","normalised_decision"]
+
+# Type buckets (simple, explainable); buckets can overlap
+MAIN_RE = re.compile("full planning|householder|listed building consent|prior approval")
+AMEND_RE = re.compile("non-material amendment|variation of conditions|minor amendment")
+COND_RE = re.compile("discharge of conditions|details pursuant|condition")
+
 def die(msg: str):
     raise RuntimeError(msg)
 
+def type_flags(types: pd.Series, pat: re.Pattern):
+    # match each category once, then broadcast via codes (missing -> code -1 -> False)
+    lut = [pat.search(str(v).lower()) is not None for v in types.cat.categories] + [False]
+    return np.array(lut, dtype=bool)[types.cat.codes.to_numpy()]
+
+def json_safe(df: pd.DataFrame):
+    # categoricals give NaN for missing values, which JSON can't encode
+    df = df.astype(object)
+    return df.where(df.notna(), None)
+
 def load_data():
     if not BUNDLES_PATH.exists():
         die(f"Missing {BUNDLES_PATH}. Put site_bundles.parquet in ./data")
     if not REPO_PATH.exists():
         die(f"Missing {REPO_PATH}. Put site_index_repo.parquet in ./data")
 
-    bundles = pd.read_parquet(BUNDLES_PATH)
-    repo = pd.read_parquet(REPO_PATH)
-
-    # Hard schema checks
-    for c in ["site_bundle_id","n_apps","council_name","sample_address","first_app","last_app"]:
-        if c not in bundles.columns:
+    # Hard schema checks (footer only, before reading any data)
+    bundle_names = set(pq.read_schema(BUNDLES_PATH).names)
+    for c in BUNDLE_COLS:
+        if c not in bundle_names:
             die(f"bundles missing column: {c}")
 
-    for c in ["site_bundle_id","planning_reference","event_dt","proposal","heading","url",
-              "normalised_application_type","normalised_decision","raw_address"]:
-        if c not in repo.columns:
+    repo_names = set(pq.read_schema(REPO_PATH).names)
+    for c in REPO_COLS:
+        if c not in repo_names:
             die(f"repo missing column: {c}")
 
+    bundles = pd.read_parquet(BUNDLES_PATH, columns=BUNDLE_COLS)
+    repo = pd.read_parquet(REPO_PATH, columns=REPO_COLS)
+
     # Normalize types
-    repo["event_dt"] = pd.to_datetime(repo["event_dt"], errors="coerce", utc=True)
+    # Lowercased search columns so /bundles can do plain substring matches
+    bundles["council_name_lower"] = bundles["council_name"].fillna("").astype(str).str.lower()
+    bundles["sample_address_lower"] = bundles["sample_address"].fillna("").astype(str).str.lower()
+
+    dt = repo["event_dt"]
+    if pd.api.types.is_datetime64_any_dtype(dt):
+        # native parquet timestamps: just normalise to UTC
+        dt = dt.dt.tz_localize("UTC") if dt.dt.tz is None else dt.dt.tz_convert("UTC")
+    else:
+        dt = pd.to_datetime(dt, format="ISO8601", utc=True, errors="coerce", cache=True)
+    repo["event_dt"] = dt
     repo = repo.dropna(subset=["event_dt"]).copy()
     repo["proposal"] = repo["proposal"].fillna("").astype(str)
     repo["heading"] = repo["heading"].fillna("").astype(str)
 
+    for c in CATEGORY_COLS:
+        repo[c] = repo[c].astype("category")
+
+    t = repo["normalised_application_type"]
+    repo["is_main"] = type_flags(t, MAIN_RE)
+    repo["is_amend"] = type_flags(t, AMEND_RE)
+    repo["is_cond"] = type_flags(t, COND_RE)
+
     return bundles, repo
 
 BUNDLES, REPO = load_data()
+# Per-bundle frames, pre-sorted by event_dt, so endpoints avoid a full-column scan
+REPO_BY_BUNDLE = {
+    bid: g.sort_values("event_dt")
+    for bid, g in REPO.groupby("site_bundle_id", sort=False, observed=True)
+}
+
+def bundle_rows(bundle_id: str):
+    r = REPO_BY_BUNDLE.get(bundle_id)
+    if r is None or r.empty:
+        raise HTTPException(404, "bundle not found")
+    return r
 
 @app.get("/health")
 def health():
@@ -84,35 +166,31 @@ def list_bundles(
     q: str = Query("", description="Search in sample_address"),
     min_apps: int = Query(5, ge=1, le=1000),
     limit: int = Query(200, ge=10, le=2000)
-):
-    b = BUNDLES.copy()
+) -> list[dict[str, Any]]:
+    b = BUNDLES[BUNDLES["n_apps"] >= min_apps]
 
     if council.strip():
-        b = b[b["council_name"].fillna("").str.contains(council, case=False, na=False)]
+        b = b[b["council_name_lower"].str.contains(council.lower(), regex=False)]
     if q.strip():
-        b = b[b["sample_address"].fillna("").str.contains(q, case=False, na=False)]
+        b = b[b["sample_address_lower"].str.contains(q.lower(), regex=False)]
 
-    b = b[b["n_apps"] >= min_apps].sort_values("n_apps", ascending=False).head(limit)
-    return b.to_dict(orient="records")
+    b = b.sort_values("n_apps", ascending=False).head(limit)
+    # zip plain column lists rather than to_dict's per-cell boxing
+    return [dict(zip(BUNDLE_COLS, row)) for row in zip(*(b[c].tolist() for c in BUNDLE_COLS))]
 
 @app.get("/repo/{bundle_id}")
 def repo_detail(bundle_id: str):
-    r = REPO[REPO["site_bundle_id"] == bundle_id].copy()
-    if r.empty:
-        raise HTTPException(404, "bundle not found")
-    r = r.sort_values("event_dt")
+    r = bundle_rows(bundle_id)
     cols = [
         "planning_reference","event_dt","normalised_application_type","normalised_decision",
         "heading","proposal","raw_address","url"
     ]
     cols = [c for c in cols if c in r.columns]
-    return {"bundle_id": bundle_id, "commits": r[cols].to_dict(orient="records")}
+    return {"bundle_id": bundle_id, "commits": json_safe(r[cols]).to_dict(orient="records")}
 
 @app.get("/repo/{bundle_id}/diff")
 def repo_diff(bundle_id: str, a: str, b: str):
-    r = REPO[REPO["site_bundle_id"] == bundle_id]
-    if r.empty:
-        raise HTTPException(404, "bundle not found")
+    r = bundle_rows(bundle_id)
 
     ra = r[r["planning_reference"] == a]
     rb = r[r["planning_reference"] == b]
@@ -122,48 +200,133 @@ def repo_diff(bundle_id: str, a: str, b: str):
     ta = (ra.iloc[0].get("proposal","") or "")[:2500]
     tb = (rb.iloc[0].get("proposal","") or "")[:2500]
 
-    diff = list(difflib.unified_diff(ta.splitlines(), tb.splitlines(), lineterm=""))
-    return {"a": a, "b": b, "diff": diff[:500]}
-
-def retrieve_commits(repo_rows, query: str, k=6):
-    texts = []
-    meta = []
-    for r in repo_rows:
-        t = f"{r.get('planning_reference','')} | {r.get('normalised_application_type','')} | {r.get('normalised_decision','')}\n"
-        t += (r.get("heading","") or "") + "\n"
-        t += (r.get("proposal","") or "")
-        texts.append(t)
-        meta.append(r)
-
-    vec = TfidfVectorizer(ngram_range=(1,2), min_df=1, max_features=30000)
-    X = vec.fit_transform(texts + [query])
-    sims = (X[:-1] @ X[-1].T).toarray().ravel()
-    top = np.argsort(-sims)[:k]
-    return [meta[i] for i in top]
-
-def gemini_answer(question: str, ctx_rows):
-    api_key = os.getenv("GEMINI_API_KEY", "")
-    if not api_key or genai is None:
+    return {"a": a, "b": b, "diff": list(compute_diff(ta, tb))}
+
+@lru_cache(maxsize=1024)
+def compute_diff(ta: str, tb: str):
+    diff = difflib.unified_diff(ta.splitlines(), tb.splitlines(), lineterm="")
+    return tuple(itertools.islice(diff, 500))
+
+# bundle_id -> (fitted vectorizer, doc matrix, rows); REPO is static so fit once per bundle
+TFIDF_CACHE = {}
+
+# Retrieval rows: just the fields chat needs, materialized once per bundle
+CTX_COLS = ["planning_reference","normalised_application_type","normalised_decision","heading","proposal","url"]
+CtxRow = namedtuple("CtxRow", CTX_COLS)
+
+def bundle_index(bundle_id: str):
+    hit = TFIDF_CACHE.get(bundle_id)
+    if hit is not None:
+        return hit
+
+    cols = json_safe(bundle_rows(bundle_id)[CTX_COLS])
+    repo_rows = list(map(CtxRow._make, zip(*(cols[c].to_numpy() for c in CTX_COLS))))
+    texts = [
+        f"{ref} | {typ} | {dec}\n{heading or ''}\n{proposal or ''}"
+        for ref, typ, dec, heading, proposal, _ in repo_rows
+    ]
+
+    vec = TfidfVectorizer(ngram_range=(1,2), min_df=1, max_features=30000,
+                          dtype=np.float32, norm="l2", sublinear_tf=True)
+    X = vec.fit_transform(texts).tocsr()
+    X.sort_indices()
+    hit = TFIDF_CACHE[bundle_id] = (vec, X, repo_rows)
+    return hit
+
+if njit is not None:
+    # Serial on purpose: bundles are small, and a parallel kernel launched from a
+    # worker thread (where retrieval runs) hangs interpreter shutdown
+    @njit(cache=True)
+    def topk_sims(data, indices, indptr, q_idx, q_val, k):
+        # CSR rows and q_idx must have sorted column indices
+        n = indptr.shape[0] - 1
+        nq = q_idx.shape[0]
+        sims = np.zeros(n, dtype=np.float32)
+        for i in range(n):
+            a, a_end, b = indptr[i], indptr[i + 1], 0
+            acc = 0.0
+            while a < a_end and b < nq:
+                ca, cb = indices[a], q_idx[b]
+                if ca == cb:
+                    acc += data[a] * q_val[b]
+                    a += 1
+                    b += 1
+                elif ca < cb:
+                    a += 1
+                else:
+                    b += 1
+            sims[i] = acc
+
+        # k is tiny: keep a sorted top-k buffer, earlier rows win ties
+        k = min(k, n)
+        top_idx = np.empty(k, dtype=np.int64)
+        top_sim = np.empty(k, dtype=np.float32)
+        filled = 0
+        for i in range(n):
+            s = sims[i]
+            if filled == k and s <= top_sim[k - 1]:
+                continue
+            j = filled if filled < k else k - 1
+            while j > 0 and top_sim[j - 1] < s:
+                top_idx[j] = top_idx[j - 1]
+                top_sim[j] = top_sim[j - 1]
+                j -= 1
+            top_idx[j] = i
+            top_sim[j] = s
+            if filled < k:
+                filled += 1
+        return top_idx, top_sim
+else:
+    topk_sims = None
+
+def retrieve_commits(bundle_id: str, query: str, k=6):
+    vec, X, repo_rows = bundle_index(bundle_id)
+    X_q = vec.transform([query])
+    if topk_sims is not None:
+        X_q.sort_indices()
+        top, _ = topk_sims(X.data, X.indices, X.indptr, X_q.indices, X_q.data, k)
+    else:
+        sims = (X @ X_q.T).toarray().ravel()
+        if k < len(sims):
+            idx = np.argpartition(-sims, k)[:k]
+            top = idx[np.argsort(-sims[idx])]
+        else:
+            top = np.argsort(-sims)
+    return [repo_rows[i] for i in top.tolist()]
+
+# Long proposals are cut to keep the Gemini prompt (and its latency/cost) bounded
+PROMPT_PROPOSAL_CHARS = 1500
+
+def build_context_block(ctx_rows):
+    parts = []
+    append = parts.append
+    for i, (ref, typ, dec, heading, proposal, url) in enumerate(ctx_rows, 1):
+        append(
+            f"[{i}] REF={ref} TYPE={typ} DECISION={dec}\n"
+            f"HEADING: {heading}\n"
+            f"PROPOSAL: {(proposal or '')[:PROMPT_PROPOSAL_CHARS]}\n"
+            f"URL: {url}\n"
+        )
+    return "\n\n".join(parts)
+
+def citations(ctx_rows):
+    return [{"planning_reference": r.planning_reference, "url": r.url} for r in ctx_rows]
+
+async def gemini_answer(client, question: str, ctx_rows):
+    if client is None:
         # fallback (still demoable)
         bullets = []
         for r in ctx_rows:
-            msg = (r.get("heading") or r.get("proposal") or "")[:140]
-            bullets.append(f"- {r.get('planning_reference')} ({r.get('normalised_application_type')}, {r.get('normalised_decision')}): {msg}")
+            msg = (r.heading or r.proposal or "")[:140]
+            bullets.append(f"- {r.planning_reference} ({r.normalised_application_type}, {r.normalised_decision}): {msg}")
         return {
             "answer": "Gemini not configured. Here are the most relevant commits:\n" + "\n".join(bullets),
-            "citations": [{"planning_reference": r.get("planning_reference"), "url": r.get("url")} for r in ctx_rows]
+            "citations": citations(ctx_rows)
         }
 
-    client = genai.Client(api_key=api_key)
     model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 
-    context_block = "\n\n".join([
-        f"[{i+1}] REF={r.get('planning_reference')} TYPE={r.get('normalised_application_type')} DECISION={r.get('normalised_decision')}\n"
-        f"HEADING: {r.get('heading','')}\n"
-        f"PROPOSAL: {r.get('proposal','')}\n"
-        f"URL: {r.get('url','')}\n"
-        for i, r in enumerate(ctx_rows)
-    ])
+    context_block = build_context_block(ctx_rows)
 
     prompt = f"""
 Answer ONLY using the context.
@@ -177,35 +340,115 @@ CONTEXT:
 {context_block}
 """.strip()
 
-    resp = client.models.generate_content(model=model, contents=prompt)
+    resp = await client.models.generate_content(model=model, contents=prompt)
     answer_text = getattr(resp, "text", None) or str(resp)
 
     return {
         "answer": answer_text,
-        "citations": [{"planning_reference": r.get("planning_reference"), "url": r.get("url")} for r in ctx_rows]
+        "citations": citations(ctx_rows)
     }
 
+# One Gemini call for several questions over a shared context; None if the reply can't be parsed
+async def gemini_batch_answer(client, questions, ctx_rows):
+    model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    numbered = "\n".join(f"Q{i+1}. {q}" for i, q in enumerate(questions))
+
+    prompt = f"""
+Answer ONLY using the context.
+Cite facts with [1], [2]...
+If context is insufficient for a question, say so in its answer.
+Reply with a JSON array of exactly {len(questions)} strings, one answer per question, in order.
+
+QUESTIONS:
+{numbered}
+
+CONTEXT:
+{build_context_block(ctx_rows)}
+""".strip()
+
+    resp = await client.models.generate_content(
+        model=model, contents=prompt, config={"response_mime_type": "application/json"}
+    )
+    try:
+        answers = json.loads(getattr(resp, "text", None) or "")
+    except ValueError:
+        return None
+    if not isinstance(answers, list) or len(answers) != len(questions):
+        return None
+    return [a if isinstance(a, str) else json.dumps(a) for a in answers]
+
 @app.post("/chat")
-def chat(payload: dict):
+async def chat(payload: dict, request: Request):
     bundle_id = (payload.get("bundle_id") or "").strip()
     question = (payload.get("question") or "").strip()
     if not bundle_id or not question:
         raise HTTPException(400, "bundle_id and question required")
 
-    r = REPO[REPO["site_bundle_id"] == bundle_id].copy()
-    if r.empty:
-        raise HTTPException(404, "bundle not found")
-
-    rows = r.sort_values("event_dt").to_dict(orient="records")
-    ctx = retrieve_commits(rows, question, k=6)
+    # retrieval is CPU work (and fits the index on first use): keep it off the event loop
+    ctx = await asyncio.to_thread(retrieve_commits, bundle_id, question, 6)
     base = repo_overview(bundle_id)
 
-    ans = gemini_answer(question, ctx)
+    ans = await gemini_answer(request.app.state.genai, question, ctx)
     ans["overview"] = base  # add actionable context
     return ans
 
+# Bounds on one /chat/batch request and on the shared context of one Gemini call
+BATCH_MAX_ITEMS = 16
+BATCH_MAX_CTX_ROWS = 24
+
+def merge_contexts(ctxs, limit):
+    # Round-robin by rank so every question keeps its best rows when the cap bites;
+    # rows are deduplicated by planning_reference (the commit id, as in /diff)
+    merged = {}
+    for rank_rows in itertools.zip_longest(*ctxs):
+        for r in rank_rows:
+            if r is not None and len(merged) < limit:
+                merged.setdefault(r.planning_reference, r)
+    return list(merged.values())
+
+@app.post("/chat/batch")
+async def chat_batch(payload: list[dict], request: Request):
+    if len(payload) > BATCH_MAX_ITEMS:
+        raise HTTPException(400, f"at most {BATCH_MAX_ITEMS} items per batch")
+    items = [((p.get("bundle_id") or "").strip(), (p.get("question") or "").strip()) for p in payload]
+    if not items or any(not bid or not q for bid, q in items):
+        raise HTTPException(400, "each item needs bundle_id and question")
+
+    # Questions on the same bundle share one retrieved context and one Gemini call
+    groups = {}
+    for i, (bid, _) in enumerate(items):
+        groups.setdefault(bid, []).append(i)
+
+    client = request.app.state.genai
+    results = [None] * len(items)
+
+    async def answer_group(bundle_id, pos):
+        questions = [items[i][1] for i in pos]
+        answers = None
+        if client is not None and len(pos) > 1:
+            ctx = await asyncio.to_thread(
+                lambda: merge_contexts([retrieve_commits(bundle_id, q, k=6) for q in questions], BATCH_MAX_CTX_ROWS)
+            )
+            # upstream errors (e.g. rate limits) propagate like /chat; only an
+            # unparseable reply falls back to one call per question
+            answers = await gemini_batch_answer(client, questions, ctx)
+
+        if answers is None:
+            replies = await asyncio.gather(*(chat({"bundle_id": bundle_id, "question": items[i][1]}, request) for i in pos))
+            for i, reply in zip(pos, replies):
+                results[i] = reply
+            return
+
+        base = repo_overview(bundle_id)
+        cites = citations(ctx)
+        for i, a in zip(pos, answers):
+            results[i] = {"answer": a, "citations": cites, "overview": base}
+
+    await asyncio.gather(*(answer_group(bid, pos) for bid, pos in groups.items()))
+    return results
+
 @app.post("/tts")
-def tts(payload: dict):
+async def tts(payload: dict, request: Request):
     text = (payload.get("text") or "").strip()
     if not text:
         raise HTTPException(400, "text required")
@@ -223,28 +466,48 @@ def tts(payload: dict):
         "output_format": "mp3_44100_128"
     }
 
-    r = requests.post(url, headers=headers, json=payload, timeout=60)
+    # read bounds the wait between chunks, so a stalled stream can't pin a pooled connection
+    http = request.app.state.http
+    req = http.build_request("POST", url, headers=headers, json=payload,
+                             timeout=httpx.Timeout(5.0, read=30.0))
+    r = await http.send(req, stream=True)
+    if r.is_error:
+        await r.aclose()
     r.raise_for_status()
-    return Response(content=r.content, media_type="audio/mpeg")
-def repo_overview(bundle_id: str):
-    r = REPO[REPO["site_bundle_id"] == bundle_id].copy()
-    if r.empty:
-        raise HTTPException(404, "bundle not found")
-    r = r.sort_values("event_dt")
 
-    # Type buckets (simple, explainable)
-    t = r["normalised_application_type"].fillna("").str.lower()
-    is_main = t.str.contains("full planning|householder|listed building consent|prior approval", regex=True)
-    is_amend = t.str.contains("non-material amendment|variation of conditions|minor amendment", regex=True)
-    is_cond = t.str.contains("discharge of conditions|details pursuant|condition", regex=True)
-
-    main_count = int(is_main.sum())
-    amend_count = int(is_amend.sum())
-    cond_count = int(is_cond.sum())
+    async def audio():
+        try:
+            async for chunk in r.aiter_bytes(chunk_size=8192):
+                yield chunk
+        finally:
+            await r.aclose()
+
+    return StreamingResponse(audio(), media_type="audio/mpeg")
+
+def count_values(s: pd.Series, fill: str):
+    # (value, count) pairs in fillna(fill).value_counts() order, counted off the category
+    # codes; missing (code -1) is reported as `fill`
+    codes = s.cat.codes.to_numpy() + 1
+    counts = np.bincount(codes, minlength=len(s.cat.categories) + 1).tolist()
+    labels = [fill] + s.cat.categories.tolist()
+    _, first = np.unique(codes, return_index=True)
+    seen = {}
+    for c in codes[np.sort(first)].tolist():
+        seen[labels[c]] = seen.get(labels[c], 0) + counts[c]
+    vals, ns = list(seen), np.array(list(seen.values()))
+    # same descending sort value_counts uses (nargsort), so ties land where they used to
+    order = np.arange(len(ns))[::-1][ns[::-1].argsort(kind="quicksort")][::-1]
+    return [(vals[i], int(ns[i])) for i in order.tolist()]
+
+def compute_overview(bundle_id: str, r: pd.DataFrame):
+    # Type buckets, precomputed in load_data
+    main_count = int(r["is_main"].sum())
+    amend_count = int(r["is_amend"].sum())
+    cond_count = int(r["is_cond"].sum())
 
     # Decision breakdown
-    dec = r["normalised_decision"].fillna("Unknown")
-    decision_counts = dec.value_counts().to_dict()
+    decision_counts = dict(count_values(r["normalised_decision"], "Unknown"))
+    approved_count = sum(n for d, n in decision_counts.items() if str(d).lower() == "approved")
 
     # Timeline
     first_dt = r["event_dt"].min()
@@ -253,7 +516,7 @@ def repo_overview(bundle_id: str):
 
     # Simple “stage”
     stage = "Unknown"
-    if (dec.str.lower() == "approved").any() and cond_count > 0:
+    if approved_count > 0 and cond_count > 0:
         stage = "Post-permission delivery (conditions/discharges)"
     elif amend_count > 0:
         stage = "Design iteration (amendments)"
@@ -261,7 +524,7 @@ def repo_overview(bundle_id: str):
         stage = "Application phase"
 
     churn_score = float(amend_count / max(len(r), 1))
-    condition_debt = float(cond_count / max(1, (dec.str.lower() == "approved").sum()))
+    condition_debt = float(cond_count / max(1, approved_count))
 
     # Actionable insights for a developer
     insights = []
@@ -281,7 +544,7 @@ def repo_overview(bundle_id: str):
         next_actions.append("Review officer feedback on withdrawn items; resubmit with explicit responses mapped to policy points.")
 
     # Surface “what happened last”
-    latest = r.iloc[-1].to_dict()
+    latest = json_safe(r.iloc[-1:]).iloc[0].to_dict()
     latest_summary = {
         "planning_reference": latest.get("planning_reference"),
         "date": str(latest.get("event_dt"))[:10],
@@ -291,7 +554,7 @@ def repo_overview(bundle_id: str):
         "url": latest.get("url")
     }
 
-    type_counts = r["normalised_application_type"].fillna("Unknown").value_counts().head(8).to_dict()
+    type_counts = dict(count_values(r["normalised_application_type"], "Unknown")[:8])
 
     return {
         "bundle_id": bundle_id,
@@ -310,6 +573,15 @@ def repo_overview(bundle_id: str):
         "next_actions": next_actions[:6],
     }
 
+# REPO is static, so every overview is computed once at startup
+OVERVIEW_CACHE = {bid: compute_overview(bid, g) for bid, g in REPO_BY_BUNDLE.items()}
+
+def repo_overview(bundle_id: str):
+    ov = OVERVIEW_CACHE.get(bundle_id)
+    if ov is None:
+        raise HTTPException(404, "bundle not found")
+    return ov
+
 @app.get("/repo/{bundle_id}/overview")
-def repo_overview_endpoint(bundle_id: str):
+def repo_overview_endpoint(bundle_id: str) -> dict[str, Any]:
     return repo_overview(bundle_id)
\ No newline at end of file